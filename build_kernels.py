@@ -0,0 +1,35 @@
+"""Ahead-of-time compilation of the hottest experiment kernel.
+
+Running this script produces a `_kernels` extension module
+(`_kernels.cpython-*.so`) next to it. When that module is importable,
+experiment/_jit_kernels prefers it over the JIT path, which removes Numba's
+first-call compile cost from the experiments entirely.
+
+Requires numba:
+
+    python build_kernels.py
+"""
+
+import numpy as np
+from numba.pycc import CC
+
+cc = CC('_kernels')
+
+
+@cc.export('treat_eff', 'f8[:](f8[:], f8[:])')
+def treat_eff(x0, x1):
+    """
+    Default treatment effect (1 + sigmoid(20(x0 - 1/3))) * (1 + sigmoid(20(x1 - 1/3)))
+    :param x0: first feature column as a contiguous float64 vector
+    :param x1: second feature column as a contiguous float64 vector
+    :return: treatment effect vector
+    """
+    out = np.empty(x0.size)
+    for i in range(x0.size):
+        out[i] = (1 + 1 / (1 + np.exp(-20 * (x0[i] - 1 / 3)))) * \
+                 (1 + 1 / (1 + np.exp(-20 * (x1[i] - 1 / 3))))
+    return out
+
+
+if __name__ == '__main__':
+    cc.compile()
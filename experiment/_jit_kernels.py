@@ -0,0 +1,113 @@
+"""JIT-compiled kernels
+
+This file defines Numba-compiled versions of the hottest numeric kernels in
+the experiments: the default double-sigmoid treatment effect and the PEHE
+reductions. Numba is optional; when it is not installed the pure NumPy
+implementations defined below are used instead, so callers can import the
+kernels unconditionally.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def treat_eff_default(x0, x1):
+        """
+        Default treatment effect (1 + sigmoid(20(x0 - 1/3))) * (1 + sigmoid(20(x1 - 1/3)))
+        :param x0: first feature column as a contiguous float64 vector
+        :param x1: second feature column as a contiguous float64 vector
+        :return: treatment effect vector
+        """
+        out = np.empty(x0.size)
+        for i in prange(x0.size):
+            out[i] = (1 + 1 / (1 + np.exp(-20 * (x0[i] - 1 / 3)))) * \
+                     (1 + 1 / (1 + np.exp(-20 * (x1[i] - 1 / 3))))
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def pehe_mse(truth, pred):
+        """
+        Mean squared error between true and predicted ITE vectors
+        :param truth: true ITE as a contiguous float64 vector
+        :param pred: predicted ITE as a contiguous float64 vector
+        :return: mean squared error
+        """
+        s = 0.0
+        for i in range(truth.size):
+            s += (truth[i] - pred[i]) ** 2
+        return s / truth.size
+
+    @njit(cache=True, fastmath=True)
+    def pehe_mae(truth, pred):
+        """
+        Mean absolute error between true and predicted ITE vectors
+        :param truth: true ITE as a contiguous float64 vector
+        :param pred: predicted ITE as a contiguous float64 vector
+        :return: mean absolute error
+        """
+        s = 0.0
+        for i in range(truth.size):
+            s += abs(truth[i] - pred[i])
+        return s / truth.size
+else:
+    def treat_eff_default(x0, x1):
+        """
+        Default treatment effect (1 + sigmoid(20(x0 - 1/3))) * (1 + sigmoid(20(x1 - 1/3)))
+        :param x0: first feature column
+        :param x1: second feature column
+        :return: treatment effect vector
+        """
+        return (1 + 1 / (1 + np.exp(-20 * (x0 - 1 / 3)))) * \
+               (1 + 1 / (1 + np.exp(-20 * (x1 - 1 / 3))))
+
+    def pehe_mse(truth, pred):
+        """
+        Mean squared error between true and predicted ITE vectors
+        :param truth: true ITE vector
+        :param pred: predicted ITE vector
+        :return: mean squared error
+        """
+        return np.mean(np.square(truth - pred))
+
+    def pehe_mae(truth, pred):
+        """
+        Mean absolute error between true and predicted ITE vectors
+        :param truth: true ITE vector
+        :param pred: predicted ITE vector
+        :return: mean absolute error
+        """
+        return np.mean(np.abs(truth - pred))
+
+
+try:
+    # Prefer the ahead-of-time compiled kernel produced by build_kernels.py;
+    # it behaves identically but skips the first-call JIT compile entirely.
+    from _kernels import treat_eff as treat_eff_default  # noqa: F811
+    AOT_AVAILABLE = True
+except ImportError:
+    AOT_AVAILABLE = False
+
+
+_warmed_up = False
+
+
+def warm_up():
+    """
+    Triggers compilation of the Numba kernels on a dummy input so the one-time
+    compile cost is paid up front instead of inside a timed experiment run.
+    :return:
+    """
+    global _warmed_up
+    if _warmed_up or not NUMBA_AVAILABLE:
+        return
+    dummy = np.zeros(2, dtype=np.float64)
+    treat_eff_default(dummy, dummy)
+    pehe_mse(dummy, dummy)
+    pehe_mae(dummy, dummy)
+    _warmed_up = True
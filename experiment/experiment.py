@@ -1,6 +1,8 @@
 from compare import *
 from typing import *
-from scipy.stats import multivariate_normal, beta
+from pathlib import Path
+import _jit_kernels
+from scipy.stats import beta
 from datetime import datetime
 import pyro.distributions as dist
 import random
@@ -8,6 +10,10 @@ import torch
 
 from utils import get_complex_latent_and_proxy, get_complex_second_latent_and_proxy
 
+# Frozen once at import time; calling beta.pdf(x, 2, 4) directly re-validates
+# the shape parameters on every call.
+_beta_2_4 = beta(2, 4)
+
 
 class Experiment:
     """
@@ -33,18 +39,23 @@ class Experiment:
         self.results: List[pd.DataFrame] = []
         self.generators: List[(Generator, int)] = []
         self.models: List[CausalMethod] = []
+        self._model_keys: List[str] = []
         self.metrics: Dict[str, Callable[[List[float], List[float]], float]] = {}
         if seed is not None:
             np.random.seed(seed)
         self.seed = seed
+        self._rng = np.random.default_rng(seed)
         self._set_defaults()
+        # Pay the one-time Numba compile cost here rather than inside a run
+        _jit_kernels.warm_up()
         self.trained: bool = False
         self.count: int = 0
         seed = f"seeded_{seed}" if seed is not None else f"randomized"
         datetime_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         hash = f"{self.__hash__()}"
         self.directory = f'experiments/experiment_{name}_{seed}_{datetime_str}_{hash}'
-        os.makedirs(self.directory, exist_ok=True)
+        self._dir = Path(self.directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
         return self
 
     def clear(self):
@@ -78,6 +89,9 @@ class Experiment:
         :return: self
         """
         self.models.append(model)
+        # str(model) stringifies the hyperparameters for some models, so cache
+        # the key here instead of recomputing it on every run
+        self._model_keys.append(str(model))
         return self
 
     def add_custom_metric(self, name: str, scoring_function: Callable[[List[float]], float]):
@@ -100,35 +114,49 @@ class Experiment:
         :param show_graphs: Boolean whether graphs should be shown
         :return: self
         """
-        model_dictionary = {}
-        for model in self.models:
-            model_dictionary[str(model)] = model
+        model_dictionary = dict(zip(self._model_keys, self.models))
         metric_dictionary = self.metrics
-        results = np.array([0 for _ in metric_dictionary])
+        # float32 is plenty for reporting-level metric aggregates and halves
+        # the memory traffic on the accumulator and the final table
+        results = np.zeros((len(model_dictionary), len(metric_dictionary)), dtype=np.float32)
+        # The sweeps look independent but train the same model instances in
+        # place (and CevaeGenerator/pyplot mutate process-global state), so
+        # they have to run one after another.
         for generator, sample_size in self.generators:
-            generator.directory = self.directory + "/" + generator.directory[5:]
-            generator.generate_data(sample_size, save_data=save_data, save_graphs=save_graphs, show_graphs=show_graphs)
-            result = run(model_dictionary, metric_dictionary,
-                         data_file=generator.directory + generator.generated_files['data'][-1],
-                         samples=sample_size, save_table=save_data,
-                         dir=generator.directory, show_graphs=show_graphs, save_graphs=save_graphs).to_numpy()
-            results = results + result
+            result = self._run_one_generator(generator, sample_size,
+                                             model_dictionary, metric_dictionary,
+                                             save_data, save_graphs, show_graphs)
+            np.add(results, result.astype(np.float32, copy=False), out=results)
 
         results = results / len(self.generators)
-        final_results = []
-        for index, result in enumerate(results):
-            result = list(result)
-            result.insert(0, list(model_dictionary.keys())[index])
-            final_results.append(result)
-        columns = list(metric_dictionary.keys())
-        columns.insert(0, 'method_name')
-        final_result = pd.DataFrame(final_results, columns=columns)
-        final_result = final_result.set_index('method_name')
+        final_result = pd.DataFrame(results,
+                                    columns=list(metric_dictionary.keys()),
+                                    index=pd.Index(list(model_dictionary.keys()), name='method_name'))
         self.results.append(final_result)
         save_pandas_table(self.directory + '/final_table', final_result)
         self.trained = True
         return final_result
 
+    def _run_one_generator(self, generator, sample_size, model_dictionary, metric_dictionary,
+                           save_data, save_graphs, show_graphs):
+        """
+        Generates data with one generator and evaluates all models on it.
+        :param generator: Generator to produce the data
+        :param sample_size: Number of samples to generate
+        :param model_dictionary: Dictionary of models to evaluate
+        :param metric_dictionary: Dictionary of metrics to measure
+        :param save_data: Boolean whether the generated data should be stored
+        :param save_graphs: Boolean whether graphs should be stored
+        :param show_graphs: Boolean whether graphs should be shown
+        :return: numpy array of metric results per model
+        """
+        generator.directory = str(self._dir / Path(generator.directory).name)
+        generator.generate_data(sample_size, save_data=save_data, save_graphs=save_graphs, show_graphs=show_graphs)
+        return run(model_dictionary, metric_dictionary,
+                   data_file=generator.directory + generator.generated_files['data'][-1],
+                   samples=sample_size, save_table=save_data,
+                   dir=generator.directory, show_graphs=show_graphs, save_graphs=save_graphs).to_numpy()
+
     def test_specific_set(self, test_set=pd.DataFrame, truth_set=pd.DataFrame):
         """
         Test all the trained models on specific data set provided by the user. Make sure to first run the 'run' method.
@@ -140,15 +168,19 @@ class Experiment:
         self.count += 1
         columns = [name for name in self.metrics]
         columns.insert(0, 'method_name')
-        df = pd.DataFrame([], columns=columns)
-        for model in self.models:
+        # The models pull .values out of the test set internally; converting it
+        # to a homogeneous float32 frame once here makes each of those
+        # per-model extractions a no-copy view instead of a fresh cast.
+        test_set = test_set.astype(np.float32)
+        truth = truth_set.to_numpy()
+        rows = []
+        for model_key, model in zip(self._model_keys, self.models):
             predictions = model.estimate_causal_effect(test_set)
-            row = [model.__str__()]
+            row = [model_key]
             for metric in self.metrics.values():
-                score = metric(truth_set.to_numpy(), predictions)
-                row.append(score)
-            df.loc[len(df.index)] = row
-        df = df.set_index('method_name')
+                row.append(metric(truth, predictions))
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=columns).set_index('method_name')
         self.results.append(df)
         save_pandas_table(self.directory + f'/table_comparing_specific_value_{self.count}', df)
         return self
@@ -265,8 +297,9 @@ class Experiment:
         :return: New experiment with the added metric
         """
         return self.add_custom_metric('PEHE (MSE)',
-                                      lambda ite_truth, ite_pred: np.sum(
-                                          [(ite_truth[i] - ite_pred[i]) ** 2 for i in range(len(ite_truth))]) / np.prod(ite_truth.shape))
+                                      lambda ite_truth, ite_pred: float(_jit_kernels.pehe_mse(
+                                          np.ascontiguousarray(ite_truth, dtype=np.float64).ravel(),
+                                          np.ascontiguousarray(ite_pred, dtype=np.float64).ravel())))
 
     def add_pehe_mse(self):
         """
@@ -288,11 +321,9 @@ class Experiment:
         :return: New experiment with the added metric
         """
         return self.add_custom_metric('PEHE (RMSE)',
-                                      lambda ite_truth, ite_pred: np.sqrt(
-                                          np.sum(
-                                              [(ite_truth[i] - ite_pred[i]) ** 2 for i in range(len(ite_truth))]
-                                          ) / np.prod(ite_truth.shape)
-                                      ))
+                                      lambda ite_truth, ite_pred: float(np.sqrt(_jit_kernels.pehe_mse(
+                                          np.ascontiguousarray(ite_truth, dtype=np.float64).ravel(),
+                                          np.ascontiguousarray(ite_pred, dtype=np.float64).ravel()))))
 
     def add_absolute_error(self):
         """
@@ -300,8 +331,9 @@ class Experiment:
         :return: New experiment with the added metric
         """
         return self.add_custom_metric('PEHE (MAE)',
-                                      lambda ite_truth, ite_pred: np.sum(
-                                          [abs(ite_truth[i] - ite_pred[i]) for i in range(len(ite_truth))]) / np.prod(ite_truth.shape))
+                                      lambda ite_truth, ite_pred: float(_jit_kernels.pehe_mae(
+                                          np.ascontiguousarray(ite_truth, dtype=np.float64).ravel(),
+                                          np.ascontiguousarray(ite_pred, dtype=np.float64).ravel())))
 
     def add_pehe_mae(self):
         """
@@ -333,16 +365,46 @@ class Experiment:
         Sets the default functions used throughout the project.
         :return:
         """
-        self.main_effect = lambda x: 2 * x[0] - 1
-        self.treatment_effect = lambda x: (1 + 1 / (1 + np.exp(-20 * (x[0] - 1 / 3)))) * (
-                1 + 1 / (1 + np.exp(-20 * (x[1] - 1 / 3))))
+        # The effect functions take the whole (N, d) feature matrix and return
+        # length-N vectors, so a full sample is one set of ufunc calls instead
+        # of one Python dispatch per row.
+        self.main_effect = lambda X: 2 * X[:, 0] - 1
+        self.treatment_effect = lambda X: _jit_kernels.treat_eff_default(
+            np.ascontiguousarray(X[:, 0], dtype=np.float64),
+            np.ascontiguousarray(X[:, 1], dtype=np.float64))
         # https://en.wikipedia.org/wiki/Beta_distribution
-        self.treatment_propensity = lambda x: (1 + beta.pdf(x[0], 2, 4)) / 4
+        self.treatment_propensity = lambda X: (1 + _beta_2_4.pdf(X[:, 0])) / 4
         self.noise = lambda: 0.05 * np.random.normal(0, 1)
-        self.treatment_function = lambda propensity, noise: 1 if np.random.random() <= propensity else 0
+        # Branchless vectorized comparison; accepts a scalar propensity or a
+        # whole propensity vector and draws matching uniforms in one RNG call
+        self.treatment_function = lambda propensity, noise=None: \
+            (self._rng.random(np.shape(propensity)) <= propensity).astype(np.int8)
+        # Batched counterparts draw a whole sample in one RNG call instead of
+        # paying the scalar np.random dispatch once per row.
+        self.noise_batch = lambda n: 0.05 * self._rng.standard_normal(n)
+        self.treatment_function_batch = lambda propensity: self.treatment_function(propensity)
+        # main, treat, treat_eff and noise may be scalars or length-N vectors;
+        # the expression broadcasts either way.
         self.outcome_function = lambda main, treat, treat_eff, noise: main + (treat - 0.5) * treat_eff + noise
         # E[Y1 - Y0 | X] = 0.5 * treat_eff(x) + 0.5*treat_eff(x) = treat_eff(x)
-        self.cate = lambda x: self.treatment_effect(x)
+        self.cate = lambda X: self.treatment_effect(X)
+
+        def fused_generate(X):
+            """
+            Produces treatment, outcome and CATE for a whole (N, d) feature
+            matrix in a single pass over its columns, chaining the batched
+            effect functions so no intermediate leaves the NumPy layer.
+            :param X: (N, d) feature matrix
+            :return: tuple of (treatment, outcome, cate) length-N vectors
+            """
+            main = self.main_effect(X)
+            treat_eff = self.treatment_effect(X)
+            propensity = self.treatment_propensity(X)
+            treat = self.treatment_function(propensity)
+            noise = self.noise_batch(X.shape[0])
+            outcome = self.outcome_function(main, treat, treat_eff, noise)
+            return treat, outcome, self.cate(X)
+        self.fused_generate = fused_generate
 
     def add_cevae_generated_data(self, distributions, proxy_function,
                                  treatment_function, outcome_function,
@@ -382,14 +444,16 @@ class Experiment:
         # treatment_function = lambda z: dist.Bernoulli(logits=z[0]).sample().cpu().item()
         if dimensions == 1:
             print("Using 1 latent variable")
-            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[0] + z[0]).sample().item()
+            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[0] + z[0]).expand([sample_size, 1]).sample()
             def outcome_function(z, t, mean=False):
                 # out_mean = z[0] * 0.7 + 0.3 * z[0] + (t - 0.5) * (z[0] + z[0]) / 2
                 out_mean = z[0] * 0.7 + 0.3 * z[0] + 0.5 * (t - 0.5) * (z[0] + z[0]) / 2
                 if mean:
-                    return dist.Normal(out_mean, 0.1).mean.item()
+                    # The mean of Normal(out_mean, 0.1) is out_mean itself;
+                    # no need to build a distribution just to read it back
+                    return out_mean
                 else:
-                    return dist.Normal(out_mean, 0.1).sample().item()
+                    return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).sample()
         elif dimensions == 3:
             print("Using 3 latent variables")
             treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[1] + z[2]).expand([sample_size, 1]).sample()
@@ -397,7 +461,9 @@ class Experiment:
                 # out_mean = z[2] * 0.7 + 0.3 * z[0] + (t - 0.5) * (z[0] + z[1]) / 2
                 out_mean = z[2] * 0.7 + 0.3 * z[0] + 0.5 * (t - 0.5) * (z[0] + z[1]) / 2
                 if mean:
-                    return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).mean
+                    # The mean of Normal(out_mean, 0.1) is out_mean itself;
+                    # no need to build a distribution just to read it back
+                    return out_mean
                 else:
                     return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).sample()
         else:
@@ -417,36 +483,42 @@ class Experiment:
         np.random.seed(data_seed)
         # distributions = [lambda: (dist.Bernoulli(0.5).sample().cpu().item() * 2) - 1]
         # distributions = [lambda: dist.Uniform(0, 2).sample().cpu().item()]
-        distributions, proxy_function = get_complex_second_latent_and_proxy(dimensions)
+        distributions, proxy_function = get_complex_second_latent_and_proxy(dimensions, sample_size)
         # noise = np.random.uniform()
         # treatment_function = lambda z: dist.Bernoulli(logits=z[0]).sample().cpu().item()
         if dimensions == 1:
             print("Using 1 latent variable")
-            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[0] + z[0]).sample().cpu().item()
+            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[0] + z[0]).expand([sample_size, 1]).sample()
             def outcome_function(z, t, mean=False):
                 out_mean = z[0] * 0.7 + 0.3 * z[0] + (t - 0.5) * (z[0] + z[0]) / 2
                 if mean:
-                    return dist.Normal(out_mean, 0.1).mean.cpu().item()
+                    # The mean of Normal(out_mean, 0.1) is out_mean itself;
+                    # no need to build a distribution just to read it back
+                    return out_mean
                 else:
-                    return dist.Normal(out_mean, 0.1).sample().cpu().item()
+                    return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).sample()
         elif dimensions == 3:
             print("Using 3 latent variables")
-            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[1] + z[2]).sample().cpu().item()
+            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[1] + z[2]).expand([sample_size, 1]).sample()
             def outcome_function(z, t, mean=False):
                 out_mean = z[2] * 0.7 + 0.3 * z[0] + (t - 0.5) * (z[0] + z[1]) / 2
                 if mean:
-                    return dist.Normal(out_mean, 0.1).mean.cpu().item()
+                    # The mean of Normal(out_mean, 0.1) is out_mean itself;
+                    # no need to build a distribution just to read it back
+                    return out_mean
                 else:
-                    return dist.Normal(out_mean, 0.1).sample().cpu().item()
+                    return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).sample()
         elif dimensions == 0:
             print("Using 0 latent variables")
-            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[1] + z[2]).sample().cpu().item()
+            treatment_function = lambda z: dist.Bernoulli(logits=z[0] + z[1] + z[2]).expand([sample_size, 1]).sample()
             def outcome_function(z, t, mean=False):
                 out_mean = z[2] * 0.7 + 0.3 * z[0] + (t - 0.5) * (z[0] + z[1]) / 2
                 if mean:
-                    return dist.Normal(out_mean, 0.1).mean.cpu().item()
+                    # The mean of Normal(out_mean, 0.1) is out_mean itself;
+                    # no need to build a distribution just to read it back
+                    return out_mean
                 else:
-                    return dist.Normal(out_mean, 0.1).sample().cpu().item()
+                    return dist.Normal(out_mean, 0.1).expand([sample_size, 1]).sample()
         else:
             raise ValueError(f"Invalid number of dimensions for the latent space: {dimensions}")
         if dimensions == 0:
@@ -160,18 +160,18 @@ def get_complex_latent_and_proxy(dimensions, sample_size):
     ]
     if dimensions == 1:
         distributions = [
-            lambda: dist.Normal(0.8, 1).sample().item(),
+            lambda: dist.Normal(0.8, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
-            [dist.Normal(z[0] * z[0] - z[0], proxy_noise_weights[0]).sample().item()],
-            [dist.Normal(torch.sigmoid(z[0] / z[0] + -3), proxy_noise_weights[1]).sample().item()],
-            [dist.Normal(z[0] * 2 + z[0] + z[0], proxy_noise_weights[2]).sample().item()],
-            [dist.Normal(torch.sigmoid(z[0] * z[0]), proxy_noise_weights[3]).sample().item()],
-            [dist.Normal(z[0] * z[0] + 2, proxy_noise_weights[4]).sample().item()],
-            [dist.Normal(z[0] * 0.2 + z[0] * 2 + z[0], proxy_noise_weights[5]).sample().item()],
-            [dist.Normal(np.sin(z[0] * z[0]), proxy_noise_weights[6]).sample().item()],
-            [dist.Normal(z[0] / z[0] + -5, proxy_noise_weights[7]).sample().item()],
-            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[8]).sample().item()],
+            [dist.Normal(z[0] * z[0] - z[0], proxy_noise_weights[0]).sample()],
+            [dist.Normal(torch.sigmoid(z[0] / z[0] + -3), proxy_noise_weights[1]).sample()],
+            [dist.Normal(z[0] * 2 + z[0] + z[0], proxy_noise_weights[2]).sample()],
+            [dist.Normal(torch.sigmoid(z[0] * z[0]), proxy_noise_weights[3]).sample()],
+            [dist.Normal(z[0] * z[0] + 2, proxy_noise_weights[4]).sample()],
+            [dist.Normal(z[0] * 0.2 + z[0] * 2 + z[0], proxy_noise_weights[5]).sample()],
+            [dist.Normal(torch.sin(z[0] * z[0]), proxy_noise_weights[6]).sample()],
+            [dist.Normal(z[0] / z[0] + -5, proxy_noise_weights[7]).sample()],
+            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[8]).sample()],
         ]
     elif dimensions == 3:
         distributions = [
@@ -192,32 +192,32 @@ def get_complex_latent_and_proxy(dimensions, sample_size):
         ]
     elif dimensions == 9:
         distributions = [
-            lambda: dist.Normal(1, 0.5).sample().item(),
-            lambda: dist.Normal(-3, 0.5).sample().item(),
-            lambda: dist.Normal(3, 1).sample().item(),
-            lambda: dist.Normal(-2, 0.5).sample().item(),
-            lambda: dist.Normal(-5, 1.2).sample().item(),
-            lambda: dist.Normal(4, 1).sample().item(),
-            lambda: dist.Normal(2, 0.2).sample().item(),
-            lambda: dist.Normal(0, 0.3).sample().item(),
-            lambda: dist.Normal(0.5, 1).sample().item(),
+            lambda: dist.Normal(1, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-3, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(3, 1).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-2, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-5, 1.2).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(4, 1).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(2, 0.2).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(0, 0.3).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(0.5, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
-            [dist.Normal(z[1] * z[2], proxy_noise_weights[0]).sample().item()],
-            [dist.Normal(z[0] * np.sum(z[4:8]), proxy_noise_weights[1]).sample().item()],
-            [dist.Normal(np.sum(z[0:4]), proxy_noise_weights[2]).sample().item()],
-            [dist.Normal(z[8] * z[7] + np.sum(z[5:7]), proxy_noise_weights[3]).sample().item()],
-            [dist.Normal(z[1] * z[0] + np.sum(z[6:8]), proxy_noise_weights[4]).sample().item()],
-            [dist.Normal(z[2] + z[1] + z[0], proxy_noise_weights[5]).sample().item()],
-            [dist.Normal(z[3] * z[6], proxy_noise_weights[6]).sample().item()],
-            [dist.Normal(z[1] * np.sum(z[3:5]), proxy_noise_weights[7]).sample().item()],
-            [dist.Normal(z[2] + z[0] + z[1], proxy_noise_weights[8]).sample().item()],
+            [dist.Normal(z[1] * z[2], proxy_noise_weights[0]).sample()],
+            [dist.Normal(z[0] * sum(z[4:8]), proxy_noise_weights[1]).sample()],
+            [dist.Normal(sum(z[0:4]), proxy_noise_weights[2]).sample()],
+            [dist.Normal(z[8] * z[7] + sum(z[5:7]), proxy_noise_weights[3]).sample()],
+            [dist.Normal(z[1] * z[0] + sum(z[6:8]), proxy_noise_weights[4]).sample()],
+            [dist.Normal(z[2] + z[1] + z[0], proxy_noise_weights[5]).sample()],
+            [dist.Normal(z[3] * z[6], proxy_noise_weights[6]).sample()],
+            [dist.Normal(z[1] * sum(z[3:5]), proxy_noise_weights[7]).sample()],
+            [dist.Normal(z[2] + z[0] + z[1], proxy_noise_weights[8]).sample()],
         ]
     elif dimensions == 0:
         distributions = [
-            lambda: dist.Normal(1, 0.5).sample().item(),
-            lambda: dist.Normal(-3, 0.5).sample().item(),
-            lambda: dist.Normal(3, 1).sample().item(),
+            lambda: dist.Normal(1, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-3, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(3, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
             [z[0]],
@@ -230,10 +230,11 @@ def get_complex_latent_and_proxy(dimensions, sample_size):
     return distributions, proxy_function
 
 
-def get_complex_second_latent_and_proxy(dimensions):
+def get_complex_second_latent_and_proxy(dimensions, sample_size):
     """
     Return latent distributions and proxy for the second complex experiment
     :param dimensions: Number of data dimensions
+    :param sample_size: Number of samples drawn per batch
     :return: the distributions and proxy function
     """
     proxy_noise_weights = [
@@ -241,41 +242,41 @@ def get_complex_second_latent_and_proxy(dimensions):
     ]
     if dimensions == 1:
         distributions = [
-            lambda: dist.Normal(0.8, 1).sample().cpu().item(),
+            lambda: dist.Normal(0.8, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
-            [dist.Normal(z[0] * z[0], proxy_noise_weights[0]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0] + -3, proxy_noise_weights[1]).sample().cpu().item()],
-            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[2]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0], proxy_noise_weights[3]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0] + 2, proxy_noise_weights[4]).sample().cpu().item()],
-            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[5]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0], proxy_noise_weights[6]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0] + -5, proxy_noise_weights[7]).sample().cpu().item()],
-            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[8]).sample().cpu().item()],
+            [dist.Normal(z[0] * z[0], proxy_noise_weights[0]).sample()],
+            [dist.Normal(z[0] * z[0] + -3, proxy_noise_weights[1]).sample()],
+            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[2]).sample()],
+            [dist.Normal(z[0] * z[0], proxy_noise_weights[3]).sample()],
+            [dist.Normal(z[0] * z[0] + 2, proxy_noise_weights[4]).sample()],
+            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[5]).sample()],
+            [dist.Normal(z[0] * z[0], proxy_noise_weights[6]).sample()],
+            [dist.Normal(z[0] * z[0] + -5, proxy_noise_weights[7]).sample()],
+            [dist.Normal(z[0] + z[0] + z[0], proxy_noise_weights[8]).sample()],
         ]
     elif dimensions == 3:
         distributions = [
-            lambda: dist.Normal(1, 0.5).sample().cpu().item(),
-            lambda: dist.Normal(-3, 0.5).sample().cpu().item(),
-            lambda: dist.Normal(3, 1).sample().cpu().item(),
+            lambda: dist.Normal(1, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-3, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(3, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
-            [dist.Normal(z[1] * z[2], proxy_noise_weights[0]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[2] + -3, proxy_noise_weights[1]).sample().cpu().item()],
-            [dist.Normal(z[2] + z[0] + z[0], proxy_noise_weights[2]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[1], proxy_noise_weights[3]).sample().cpu().item()],
-            [dist.Normal(z[1] * z[0] + 2, proxy_noise_weights[4]).sample().cpu().item()],
-            [dist.Normal(z[2] + z[1] + z[0], proxy_noise_weights[5]).sample().cpu().item()],
-            [dist.Normal(z[0] * z[0], proxy_noise_weights[6]).sample().cpu().item()],
-            [dist.Normal(z[1] * z[2] + -5, proxy_noise_weights[7]).sample().cpu().item()],
-            [dist.Normal(z[2] + z[0] + z[1], proxy_noise_weights[8]).sample().cpu().item()],
+            [dist.Normal(z[1] * z[2], proxy_noise_weights[0]).sample()],
+            [dist.Normal(z[0] * z[2] + -3, proxy_noise_weights[1]).sample()],
+            [dist.Normal(z[2] + z[0] + z[0], proxy_noise_weights[2]).sample()],
+            [dist.Normal(z[0] * z[1], proxy_noise_weights[3]).sample()],
+            [dist.Normal(z[1] * z[0] + 2, proxy_noise_weights[4]).sample()],
+            [dist.Normal(z[2] + z[1] + z[0], proxy_noise_weights[5]).sample()],
+            [dist.Normal(z[0] * z[0], proxy_noise_weights[6]).sample()],
+            [dist.Normal(z[1] * z[2] + -5, proxy_noise_weights[7]).sample()],
+            [dist.Normal(z[2] + z[0] + z[1], proxy_noise_weights[8]).sample()],
         ]
     elif dimensions == 0:
         distributions = [
-            lambda: dist.Normal(1, 0.5).sample().cpu().item(),
-            lambda: dist.Normal(-3, 0.5).sample().cpu().item(),
-            lambda: dist.Normal(3, 1).sample().cpu().item(),
+            lambda: dist.Normal(1, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(-3, 0.5).expand([sample_size, 1]).sample(),
+            lambda: dist.Normal(3, 1).expand([sample_size, 1]).sample(),
         ]
         proxy_function = lambda z: [
             [z[0]],